@@ -0,0 +1,41 @@
+"""add trade query indexes
+
+Revision ID: 3a7c1e9b2d40
+Revises:
+Create Date: 2025-06-02 10:14:27.512083
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c1e9b2d40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_trades_account_date',
+            'trades',
+            ['account_id', sa.text('trade_date DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_trade_accounts_user_id',
+            'trade_accounts',
+            ['user_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_trade_accounts_user_id', table_name='trade_accounts', postgresql_concurrently=True)
+        op.drop_index('ix_trades_account_date', table_name='trades', postgresql_concurrently=True)
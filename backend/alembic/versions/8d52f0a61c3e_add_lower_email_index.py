@@ -0,0 +1,34 @@
+"""add lower(email) index on users
+
+Revision ID: 8d52f0a61c3e
+Revises: 3a7c1e9b2d40
+Create Date: 2025-06-03 09:41:12.230954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d52f0a61c3e'
+down_revision = '3a7c1e9b2d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fails if existing rows differ only by email case; merge those accounts first
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""add data_version to users
+
+Revision ID: c41b7e2f9a85
+Revises: 8d52f0a61c3e
+Create Date: 2025-06-04 16:22:05.871346
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41b7e2f9a85'
+down_revision = '8d52f0a61c3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases built by init_db.py already have the column from create_all
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'data_version' not in columns:
+        op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,33 @@
+"""add trade account/symbol/date index
+
+Revision ID: e7a3d9c05b12
+Revises: c41b7e2f9a85
+Create Date: 2025-06-09 11:37:52.204618
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3d9c05b12'
+down_revision = 'c41b7e2f9a85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_trade_account_symbol_date',
+            'trades',
+            ['account_id', 'symbol', 'trade_date'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_trade_account_symbol_date', table_name='trades', postgresql_concurrently=True)
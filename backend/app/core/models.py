@@ -1,29 +1,44 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Numeric
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Numeric, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import os
+import time
 import uuid
 from app.core.database import Base
 
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 v7) so new rows append to the right edge of PK indexes"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     subscription_tier = Column(String(50), default="free")
     is_active = Column(Boolean, default=True)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # ETag for accounts, tags, dashboard stats and win/loss; bumped by writes that change them
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     trade_accounts = relationship("TradeAccount", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Case-insensitive email lookups hit this index with a single probe
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
 class TradeAccount(Base):
     __tablename__ = "trade_accounts"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     account_name = Column(String(255), nullable=False)
     broker = Column(String(100), default="IBKR")
     account_number = Column(String(100))
@@ -36,7 +51,7 @@ class TradeAccount(Base):
 class Trade(Base):
     __tablename__ = "trades"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     account_id = Column(UUID(as_uuid=True), ForeignKey("trade_accounts.id"), nullable=False)
     symbol = Column(String(20), nullable=False, index=True)
     quantity = Column(Numeric(15, 8), nullable=False)
@@ -55,10 +70,17 @@ class Trade(Base):
     tags = relationship("TradeTagAssociation", back_populates="trade", cascade="all, delete-orphan")
     journal_entries = relationship("TradeJournalEntry", back_populates="trade", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves the per-account "newest first" listing without a sort step
+        Index("ix_trades_account_date", account_id, trade_date.desc()),
+        # Lets P&L matching read each symbol's trades in date order
+        Index("ix_trade_account_symbol_date", account_id, symbol, trade_date),
+    )
+
 class TradeTag(Base):
     __tablename__ = "trade_tags"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     name = Column(String(100), nullable=False)
     color = Column(String(7), default="#3B82F6")  # Hex color
@@ -80,7 +102,7 @@ class TradeTagAssociation(Base):
 class TradeJournalEntry(Base):
     __tablename__ = "trade_journal_entries"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     trade_id = Column(UUID(as_uuid=True), ForeignKey("trades.id"), nullable=False)
     entry_text = Column(Text, nullable=False)
     entry_date = Column(DateTime(timezone=True), server_default=func.now())
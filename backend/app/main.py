@@ -1,13 +1,25 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.modules.auth.router import router as auth_router
 from app.modules.tradelog.router import router as tradelog_router
+from app.modules.tradelog.pnl import warm_up as warm_up_pnl_kernel
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pull the P&L kernel from numba's on-disk cache (compiling it on first
+    # deploy) before serving, instead of on the first analytics request
+    warm_up_pnl_kernel()
+    yield
 
 app = FastAPI(
     title="TradeWizard API",
     description="Trading journal and analytics platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware - must be added before routes
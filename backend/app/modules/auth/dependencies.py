@@ -2,7 +2,6 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import verify_token
 from app.modules.auth.service import AuthService
 from app.core.models import User
 
@@ -18,12 +17,8 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise credentials_exception
-    
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(email)
+    user = auth_service.get_user_by_token(credentials.credentials)
     if user is None:
         raise credentials_exception
     
@@ -15,20 +15,20 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     auth_service = AuthService(db)
     
     # Check if user already exists
-    if auth_service.get_user_by_email(user.email):
+    if auth_service.email_exists(user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create user
-    db_user = auth_service.create_user(user)
+    db_user = await auth_service.create_user(user)
     return db_user
 
 @router.post("/login", response_model=Token)
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(user_credentials.email, user_credentials.password)
+    user = await auth_service.authenticate_user(user_credentials.email, user_credentials.password)
     
     if not user:
         raise HTTPException(
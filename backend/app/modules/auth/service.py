@@ -1,15 +1,34 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from cachetools import TTLCache
 from app.core.models import User
 from app.modules.auth.schemas import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password, decode_access_token
 from typing import Optional
+import asyncio
+import hashlib
+import threading
+import time
+
+# Validated bearer tokens, keyed by SHA-256 of the token. Each entry holds the
+# resolved user and the time it stops being trusted: 60s, or the token's own
+# expiry if that comes first. There is no explicit invalidation, so a cached
+# user (including one deactivated since) is served for up to
+# TOKEN_CACHE_TTL_SECONDS.
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_user(self, user: UserCreate) -> User:
-        hashed_password = get_password_hash(user.password)
+    async def create_user(self, user: UserCreate) -> User:
+        # Password hashing is CPU-bound; hash on a worker thread so the event loop stays free
+        hashed_password = await asyncio.to_thread(get_password_hash, user.password)
         db_user = User(
             email=user.email,
             password_hash=hashed_password
@@ -20,15 +39,55 @@ class AuthService:
         return db_user
 
     def get_user_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.query(User).filter(func.lower(User.email) == email.lower()).first()
+
+    def email_exists(self, email: str) -> bool:
+        # EXISTS lets the database stop at the first match without returning the row
+        return self.db.query(
+            self.db.query(User).filter(func.lower(User.email) == email.lower()).exists()
+        ).scalar()
 
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         user = self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        verified, new_hash = await asyncio.to_thread(
+            verify_and_update_password, password, user.password_hash
+        )
+        if not verified:
             return None
+        if new_hash:
+            # Legacy bcrypt hash: store the argon2 replacement
+            user.password_hash = new_hash
+            self.db.commit()
         return user
 
     def get_user_by_id(self, user_id: str) -> Optional[User]:
-        return self.db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+        return self.db.query(User).filter(User.id == user_id).first()
+
+    def get_user_by_token(self, token: str) -> Optional[User]:
+        """Resolve a bearer token to its user, skipping the DB for recently seen tokens"""
+        key = _token_key(token)
+        now = time.time()
+        with _token_cache_lock:
+            cached = _token_cache.get(key)
+        if cached is not None:
+            user, valid_until = cached
+            if now < valid_until:
+                return user
+
+        payload = decode_access_token(token)
+        if payload is None or payload.get("sub") is None:
+            return None
+
+        user = self.get_user_by_email(payload["sub"])
+        if user is None:
+            return None
+
+        # Detach the instance so commits made later in this request cannot
+        # expire the copy that other requests read from the cache
+        self.db.expunge(user)
+        valid_until = min(payload.get("exp", now), now + TOKEN_CACHE_TTL_SECONDS)
+        with _token_cache_lock:
+            _token_cache[key] = (user, valid_until)
+        return user
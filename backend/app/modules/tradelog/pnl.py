@@ -0,0 +1,87 @@
+from decimal import Decimal
+from typing import Tuple
+import numba
+import numpy as np
+
+# Half of the smallest stored quantity step (Numeric(15, 8)). Float leftovers
+# below this after a close are rounding noise, not an open position.
+POSITION_EPSILON = 5e-9
+
+# Decimal places kept when handing kernel results back to the API (Numeric(15, 8))
+DECIMAL_PLACES = 8
+
+
+@numba.njit(cache=True, nogil=True)
+def match_positions(
+    prices: np.ndarray,
+    quantities: np.ndarray,
+    is_buy: np.ndarray,
+    commissions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Walk one symbol's trades in date order using running average cost.
+
+    Returns, for each SELL that closes part of an open position: net P&L,
+    closed quantity, average entry price, the index of the closing trade and
+    the index of the most recent BUY before it.
+    """
+    n = prices.shape[0]
+    pnls = np.empty(n, dtype=np.float64)
+    close_qtys = np.empty(n, dtype=np.float64)
+    entry_prices = np.empty(n, dtype=np.float64)
+    close_idx = np.empty(n, dtype=np.int64)
+    open_idx = np.empty(n, dtype=np.int64)
+
+    count = 0
+    position = 0.0
+    avg_price = 0.0
+    last_open = -1
+    for i in range(n):
+        if is_buy[i]:
+            if position == 0.0:
+                avg_price = prices[i]
+            else:
+                avg_price = (avg_price * position + prices[i] * quantities[i]) / (position + quantities[i])
+            position += quantities[i]
+            last_open = i
+        elif position > 0.0:
+            # Overselling only closes what is open; the position never goes short
+            close_qty = min(quantities[i], position)
+            pnls[count] = (prices[i] - avg_price) * close_qty - commissions[i]
+            close_qtys[count] = close_qty
+            entry_prices[count] = avg_price
+            close_idx[count] = i
+            open_idx[count] = last_open
+            count += 1
+
+            position -= close_qty
+            if position < POSITION_EPSILON:
+                position = 0.0
+                avg_price = 0.0
+
+    return pnls[:count], close_qtys[:count], entry_prices[:count], close_idx[:count], open_idx[:count]
+
+
+def trade_arrays(trades, include_commission: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Build the kernel's input arrays from trade rows (ORM objects or column tuples)"""
+    n = len(trades)
+    prices = np.fromiter((float(t.price) for t in trades), dtype=np.float64, count=n)
+    quantities = np.fromiter((float(t.quantity) for t in trades), dtype=np.float64, count=n)
+    is_buy = np.fromiter((t.side == 'BUY' for t in trades), dtype=np.bool_, count=n)
+    if include_commission:
+        commissions = np.fromiter((float(t.commission or 0) for t in trades), dtype=np.float64, count=n)
+    else:
+        commissions = np.zeros(n, dtype=np.float64)
+    return prices, quantities, is_buy, commissions
+
+
+def to_decimal(value: float) -> Decimal:
+    """Convert a kernel result back to Decimal for the API layer, rounded to
+    the stored quantity scale so float noise (e.g. -8497.999999999998) is dropped"""
+    # Adding 0.0 turns a rounded -0.0 into 0.0
+    return Decimal(repr(round(value, DECIMAL_PLACES) + 0.0))
+
+
+def warm_up() -> None:
+    """Load (or compile) the kernel once so the first request does not pay for it"""
+    one = np.ones(1, dtype=np.float64)
+    match_positions(one, one, np.ones(1, dtype=np.bool_), one)
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import and_, cast, Float
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
+from datetime import date
+import asyncio
 import uuid
 
 from app.core.database import get_db
 from app.modules.auth.dependencies import get_current_user
-from app.core.models import User
+from app.core.models import (
+    User,
+    Trade as TradeModel,
+    TradeAccount as TradeAccountModel,
+    TradeTag as TradeTagModel,
+    TradeJournalEntry as JournalModel,
+    TradeTagAssociation
+)
 from app.modules.tradelog.service import TradeLogService
 from app.modules.tradelog.schemas import (
     # Trade schemas
@@ -24,6 +36,40 @@ from app.modules.tradelog.schemas import (
 
 router = APIRouter()
 
+# Built once at import. Handlers that return these shapes serialize the result
+# themselves and hand back an ORJSONResponse, skipping FastAPI's second
+# validation pass over the return value.
+_TRADE_ACCOUNT_LIST_ADAPTER = TypeAdapter(List[TradeAccount])
+_TRADE_TAG_LIST_ADAPTER = TypeAdapter(List[TradeTag])
+
+def _orm_list_response(adapter: TypeAdapter, objects) -> ORJSONResponse:
+    """Validate ORM objects through a prebuilt adapter and render them as JSON"""
+    return ORJSONResponse(adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json"))
+
+# Per-user reads are revalidated on every use; the ETag lets an unchanged
+# response come back as an empty 304 without re-running the query behind it
+_CACHE_CONTROL = "private, no-cache"
+
+def _user_data_etag(db: Session, user_id: uuid.UUID, *variant: str) -> str:
+    """Build an ETag from the user's data version, which writes to trades, accounts and tags bump"""
+    version = db.query(User.data_version).filter(User.id == user_id).scalar()
+    return '"' + "-".join([str(user_id), str(version), *variant]) + '"'
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+    return None
+
+def _with_cache_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    return response
+
 # Trade Account Management
 @router.post("/accounts", response_model=TradeAccount, status_code=status.HTTP_201_CREATED)
 async def create_trade_account(
@@ -32,26 +78,29 @@ async def create_trade_account(
     db: Session = Depends(get_db)
 ):
     """Create a new trading account"""
-    from app.core.models import TradeAccount as TradeAccountModel
-    
-    account = TradeAccountModel(**account_data.dict(), user_id=current_user.id)
+    account = TradeAccountModel(**account_data.model_dump(), user_id=current_user.id)
     db.add(account)
+    TradeLogService(db).mark_user_data_changed(current_user.id)
     db.commit()
     db.refresh(account)
     return account
 
 @router.get("/accounts", response_model=List[TradeAccount])
 async def get_trade_accounts(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all trading accounts for the current user"""
-    from app.core.models import TradeAccount as TradeAccountModel
-    
+    etag = _user_data_etag(db, current_user.id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     accounts = db.query(TradeAccountModel).filter(
         TradeAccountModel.user_id == current_user.id
     ).all()
-    return accounts
+    return _with_cache_headers(_orm_list_response(_TRADE_ACCOUNT_LIST_ADAPTER, accounts), etag)
 
 @router.put("/accounts/{account_id}", response_model=TradeAccount)
 async def update_trade_account(
@@ -61,8 +110,6 @@ async def update_trade_account(
     db: Session = Depends(get_db)
 ):
     """Update a trading account"""
-    from app.core.models import TradeAccount as TradeAccountModel
-    
     account = db.query(TradeAccountModel).filter(
         TradeAccountModel.id == account_id,
         TradeAccountModel.user_id == current_user.id
@@ -71,10 +118,11 @@ async def update_trade_account(
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    update_data = account_data.dict(exclude_unset=True)
+    update_data = account_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(account, field, value)
     
+    TradeLogService(db).mark_user_data_changed(current_user.id)
     db.commit()
     db.refresh(account)
     return account
@@ -96,30 +144,39 @@ async def get_trades_simple(
     db: Session = Depends(get_db)
 ):
     """Get trades in simple format"""
-    from app.core.models import Trade as TradeModel, TradeAccount
-    
-    trades = db.query(TradeModel)\
-        .join(TradeAccount)\
-        .filter(TradeAccount.user_id == current_user.id)\
+    # Column-only query: rows come back as plain tuples, skipping ORM hydration
+    rows = db.query(
+            TradeModel.id,
+            TradeModel.symbol,
+            TradeModel.side,
+            cast(TradeModel.quantity, Float).label("quantity"),
+            cast(TradeModel.price, Float).label("price"),
+            TradeModel.trade_date,
+            cast(TradeModel.commission, Float).label("commission"),
+            TradeModel.currency
+        )\
+        .join(TradeAccountModel)\
+        .filter(TradeAccountModel.user_id == current_user.id)\
         .order_by(TradeModel.trade_date.desc())\
         .all()
-    
+
     result = []
-    for trade in trades:
+    for row in rows:
         result.append({
-            "id": str(trade.id),
-            "symbol": trade.symbol,
-            "side": trade.side,
-            "quantity": float(trade.quantity),
-            "price": float(trade.price),
-            "trade_date": trade.trade_date.isoformat(),
-            "commission": float(trade.commission),
-            "currency": trade.currency,
+            "id": str(row.id),
+            "symbol": row.symbol,
+            "side": row.side,
+            "quantity": row.quantity,
+            "price": row.price,
+            "trade_date": row.trade_date.isoformat(),
+            "commission": row.commission,
+            "currency": row.currency,
             "pnl": 0,  # TODO: Calculate P&L
             "pnl_percent": 0  # TODO: Calculate P&L percentage
         })
-    
-    return result
+
+    # Already JSON-native; skip jsonable_encoder's walk over every row
+    return ORJSONResponse(result)
 
 @router.get("/trades/{trade_id}", response_model=TradeWithDetails)
 async def get_trade(
@@ -128,26 +185,28 @@ async def get_trade(
     db: Session = Depends(get_db)
 ):
     """Get a specific trade"""
-    from app.core.models import Trade as TradeModel, TradeAccount as TradeAccountModel
-    from sqlalchemy.orm import joinedload
-    from sqlalchemy import and_
-    
+    # selectinload issues one IN-query per collection instead of a tags x journal
+    # Cartesian join, and pre-fetches each association's tag
     trade = db.query(TradeModel)\
         .join(TradeAccountModel)\
         .filter(
             and_(TradeModel.id == trade_id, TradeAccountModel.user_id == current_user.id)
         )\
-        .options(joinedload(TradeModel.tags), joinedload(TradeModel.journal_entries))\
+        .options(
+            selectinload(TradeModel.tags).selectinload(TradeTagAssociation.tag),
+            selectinload(TradeModel.journal_entries)
+        )\
         .first()
-    
+
     if not trade:
         raise HTTPException(status_code=404, detail="Trade not found")
-    
-    return TradeWithDetails(
-        **trade.__dict__,
+
+    details = TradeWithDetails(
+        **Trade.model_validate(trade).model_dump(),
         tags=[tag.tag for tag in trade.tags],
         journal_entries=trade.journal_entries
     )
+    return ORJSONResponse(details.model_dump(mode="json"))
 
 @router.put("/trades/{trade_id}", response_model=Trade)
 async def update_trade(
@@ -183,18 +242,27 @@ async def import_trades_csv(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
+    # Parsing and batch inserts are synchronous; run them off the event loop
     service = TradeLogService(db)
-    return service.import_from_csv(file, account_id, current_user.id)
+    return await asyncio.to_thread(service.import_from_csv, file, account_id, current_user.id)
 
 # Analytics and Dashboard
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics"""
+    etag = _user_data_etag(db, current_user.id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    # The P&L walk is CPU-bound Python over every trade; keep it off the event loop
     service = TradeLogService(db)
-    return service.get_dashboard_stats(current_user.id)
+    stats = await asyncio.to_thread(service.get_dashboard_stats, current_user.id)
+    return _with_cache_headers(ORJSONResponse(stats.model_dump(mode="json")), etag)
 
 @router.get("/test-trades")
 async def test_trades_endpoint(
@@ -215,24 +283,34 @@ async def get_performance_analytics(
     """Get detailed performance analytics"""
     # This would be implemented with more complex analytics logic
     service = TradeLogService(db)
-    stats = service.get_dashboard_stats(current_user.id)
+    stats = await asyncio.to_thread(service.get_dashboard_stats, current_user.id)
     
     # Placeholder implementation - you'll want to expand this
-    return PerformanceAnalytics(
+    analytics = PerformanceAnalytics(
         pnl_by_symbol=[],
         daily_pnl=[],
         monthly_summary=stats
     )
+    return ORJSONResponse(analytics.model_dump(mode="json"))
 
 @router.get("/analytics/win-loss", response_model=WinLossAnalysis)
 async def get_win_loss_analysis(
+    request: Request,
     time_period: str = Query(default="all", description="Time period: all, 1m, 3m, 6m, 1y, ytd"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive win/loss analysis breakdown by timeframe, symbol, and strategy"""
+    # Relative periods slide with the calendar, so their ETag also changes daily
+    variant = [] if time_period == "all" else [date.today().isoformat()]
+    etag = _user_data_etag(db, current_user.id, *variant)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     service = TradeLogService(db)
-    return service.get_win_loss_analysis(current_user.id, time_period)
+    analysis = await asyncio.to_thread(service.get_win_loss_analysis, current_user.id, time_period)
+    return _with_cache_headers(ORJSONResponse(analysis.model_dump(mode="json")), etag)
 
 # Tag Management
 @router.post("/tags", response_model=TradeTag, status_code=status.HTTP_201_CREATED)
@@ -247,12 +325,18 @@ async def create_tag(
 
 @router.get("/tags", response_model=List[TradeTag])
 async def get_tags(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all tags for the current user"""
+    etag = _user_data_etag(db, current_user.id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     service = TradeLogService(db)
-    return service.get_user_tags(current_user.id)
+    return _with_cache_headers(_orm_list_response(_TRADE_TAG_LIST_ADAPTER, service.get_user_tags(current_user.id)), etag)
 
 @router.put("/tags/{tag_id}", response_model=TradeTag)
 async def update_tag(
@@ -262,8 +346,6 @@ async def update_tag(
     db: Session = Depends(get_db)
 ):
     """Update a trade tag"""
-    from app.core.models import TradeTag as TradeTagModel
-    
     tag = db.query(TradeTagModel).filter(
         TradeTagModel.id == tag_id,
         TradeTagModel.user_id == current_user.id
@@ -272,10 +354,11 @@ async def update_tag(
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
-    update_data = tag_data.dict(exclude_unset=True)
+    update_data = tag_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(tag, field, value)
     
+    TradeLogService(db).mark_user_data_changed(current_user.id)
     db.commit()
     db.refresh(tag)
     return tag
@@ -287,8 +370,6 @@ async def delete_tag(
     db: Session = Depends(get_db)
 ):
     """Delete a trade tag"""
-    from app.core.models import TradeTag as TradeTagModel
-    
     tag = db.query(TradeTagModel).filter(
         TradeTagModel.id == tag_id,
         TradeTagModel.user_id == current_user.id
@@ -298,6 +379,7 @@ async def delete_tag(
         raise HTTPException(status_code=404, detail="Tag not found")
     
     db.delete(tag)
+    TradeLogService(db).mark_user_data_changed(current_user.id)
     db.commit()
     return {"message": "Tag deleted successfully"}
 
@@ -319,9 +401,6 @@ async def get_trade_journal_entries(
     db: Session = Depends(get_db)
 ):
     """Get all journal entries for a specific trade"""
-    from app.core.models import TradeJournalEntry as JournalModel, Trade as TradeModel, TradeAccount as TradeAccountModel
-    from sqlalchemy import and_
-    
     entries = db.query(JournalModel)\
         .join(TradeModel)\
         .join(TradeAccountModel)\
@@ -342,9 +421,6 @@ async def update_journal_entry(
     db: Session = Depends(get_db)
 ):
     """Update a journal entry"""
-    from app.core.models import TradeJournalEntry as JournalModel, Trade as TradeModel, TradeAccount as TradeAccountModel
-    from sqlalchemy import and_
-    
     entry = db.query(JournalModel)\
         .join(TradeModel)\
         .join(TradeAccountModel)\
@@ -370,9 +446,6 @@ async def delete_journal_entry(
     db: Session = Depends(get_db)
 ):
     """Delete a journal entry"""
-    from app.core.models import TradeJournalEntry as JournalModel, Trade as TradeModel, TradeAccount as TradeAccountModel
-    from sqlalchemy import and_
-    
     entry = db.query(JournalModel)\
         .join(TradeModel)\
         .join(TradeAccountModel)\
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
@@ -22,8 +22,7 @@ class TradeAccount(BaseModel):
     account_number: Optional[str]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TradeCreate(BaseModel):
     account_id: uuid.UUID
@@ -63,8 +62,7 @@ class Trade(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TradeWithPnL(Trade):
     pnl: Optional[Decimal] = None
@@ -103,8 +101,7 @@ class TradeTag(BaseModel):
     color: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Journal entry schemas
 class TradeJournalCreate(BaseModel):
@@ -121,8 +118,7 @@ class TradeJournalEntry(BaseModel):
     entry_date: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Enhanced trade schemas with relationships
 class TradeWithDetails(Trade):
@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 from sqlalchemy import and_, or_, desc, func
 from typing import List, Optional, Dict, Tuple
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter
 import uuid
 import csv
 import io
@@ -16,12 +17,35 @@ from app.modules.tradelog.schemas import (
     WinLossBreakdown, WinLossByTimeframe, WinLossBySymbol, 
     WinLossByStrategy, WinLossAnalysis
 )
+from app.modules.tradelog.pnl import match_positions, trade_arrays, to_decimal
+
+# Rows per multi-row INSERT when importing CSV statements
+IMPORT_BATCH_SIZE = 1000
+
+# Look-back window in days for the relative win/loss periods; "ytd" is calendar based
+_CUTOFF_DAYS = {"1m": 30, "3m": 90, "6m": 180, "1y": 365}
+
+# Imports write plain rows through Core: no ORM bulk-save bookkeeping per batch
+_TRADE_TABLE_INSERT = Trade.__table__.insert()
+
+
+def _fast_parse_ibkr_dt(s: str) -> datetime:
+    """Parse an IBKR "2025-04-09;14:18:37" timestamp by slicing; much cheaper than strptime per row"""
+    if len(s) != 19 or s[10] != ';':
+        raise ValueError(f"time data {s!r} does not match format '%Y-%m-%d;%H:%M:%S'")
+    return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
 
 
 class TradeLogService:
     def __init__(self, db: Session):
         self.db = db
 
+    def mark_user_data_changed(self, user_id: uuid.UUID):
+        """Bump the user's data version so ETag-cached reads revalidate"""
+        self.db.query(User).filter(User.id == user_id).update(
+            {User.data_version: User.data_version + 1}, synchronize_session=False
+        )
+
     def create_trade(self, trade_data: TradeCreate, user_id: uuid.UUID) -> Trade:
         """Create a new trade"""
         # Verify account belongs to user
@@ -32,8 +56,9 @@ class TradeLogService:
         if not account:
             raise HTTPException(status_code=404, detail="Trade account not found")
         
-        trade = Trade(**trade_data.dict())
+        trade = Trade(**trade_data.model_dump())
         self.db.add(trade)
+        self.mark_user_data_changed(user_id)
         self.db.commit()
         self.db.refresh(trade)
         return trade
@@ -46,7 +71,8 @@ class TradeLogService:
         limit: int = 100
     ) -> List[Trade]:
         """Get trades with filtering and pagination"""
-        query = self.db.query(Trade).join(TradeAccount).filter(
+        # The ownership join also populates trade.account, so no second JOIN is emitted
+        query = self.db.query(Trade).join(Trade.account).options(contains_eager(Trade.account)).filter(
             TradeAccount.user_id == user_id
         )
         
@@ -69,24 +95,25 @@ class TradeLogService:
 
     def update_trade(self, trade_id: uuid.UUID, trade_data: TradeUpdate, user_id: uuid.UUID) -> Trade:
         """Update an existing trade"""
-        trade = self.db.query(Trade).join(TradeAccount).filter(
+        trade = self.db.query(Trade).join(Trade.account).options(contains_eager(Trade.account)).filter(
             and_(Trade.id == trade_id, TradeAccount.user_id == user_id)
         ).first()
         
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
-        update_data = trade_data.dict(exclude_unset=True)
+        update_data = trade_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(trade, field, value)
         
+        self.mark_user_data_changed(user_id)
         self.db.commit()
         self.db.refresh(trade)
         return trade
 
     def delete_trade(self, trade_id: uuid.UUID, user_id: uuid.UUID):
         """Delete a trade"""
-        trade = self.db.query(Trade).join(TradeAccount).filter(
+        trade = self.db.query(Trade).join(Trade.account).options(contains_eager(Trade.account)).filter(
             and_(Trade.id == trade_id, TradeAccount.user_id == user_id)
         ).first()
         
@@ -94,64 +121,58 @@ class TradeLogService:
             raise HTTPException(status_code=404, detail="Trade not found")
         
         self.db.delete(trade)
+        self.mark_user_data_changed(user_id)
         self.db.commit()
 
     def get_dashboard_stats(self, user_id: uuid.UUID) -> DashboardStats:
         """Calculate dashboard statistics"""
-        trades = self.db.query(Trade).join(TradeAccount).filter(
+        # Counts, sums and extremes come back from the database as a single row
+        total_trades, total_commission, best_trade, worst_trade = self.db.query(
+            func.count(Trade.id),
+            func.coalesce(func.sum(Trade.commission), 0),
+            func.max(Trade.price * Trade.quantity),
+            func.min(Trade.price * Trade.quantity)
+        ).join(TradeAccount).filter(
             TradeAccount.user_id == user_id
-        ).all()
+        ).one()
         
-        if not trades:
+        if not total_trades:
             return DashboardStats(
                 total_trades=0,
-                total_pnl=Decimal('0'),
+                total_pnl=to_decimal(0.0),
                 win_rate=0.0,
                 total_commission=Decimal('0')
             )
         
+        # P&L needs the running average price, so it is still walked in Python.
+        # Only the columns the walk reads are fetched, as plain rows, already
+        # in (symbol, trade_date) order.
+        rows = self.db.query(
+            Trade.symbol, Trade.side, Trade.price, Trade.quantity
+        ).join(TradeAccount).filter(
+            TradeAccount.user_id == user_id
+        ).order_by(Trade.symbol, Trade.trade_date).all()
+        
         # Calculate P&L for each trade (simplified - assumes all trades are closed)
-        total_pnl = Decimal('0')
+        total_pnl = 0.0
         winning_trades = 0
-        total_commission = sum(trade.commission for trade in trades)
-        
-        # Group trades by symbol to calculate P&L
-        positions = {}
-        for trade in trades:
-            if trade.symbol not in positions:
-                positions[trade.symbol] = []
-            positions[trade.symbol].append(trade)
-        
-        # Calculate P&L for each position
-        for symbol, symbol_trades in positions.items():
-            symbol_trades.sort(key=lambda x: x.trade_date)
-            position = Decimal('0')
-            avg_price = Decimal('0')
-            
-            for trade in symbol_trades:
-                if trade.side == 'BUY':
-                    if position == 0:
-                        avg_price = trade.price
-                    else:
-                        avg_price = ((avg_price * position) + (trade.price * trade.quantity)) / (position + trade.quantity)
-                    position += trade.quantity
-                else:  # SELL
-                    if position > 0:
-                        pnl = (trade.price - avg_price) * min(trade.quantity, position)
-                        total_pnl += pnl
-                        if pnl > 0:
-                            winning_trades += 1
-                        position -= trade.quantity
-        
-        win_rate = (winning_trades / len(trades)) * 100 if trades else 0
+        
+        # Calculate P&L per symbol; rows arrive grouped, so only one symbol's
+        # trades are materialised at a time. The dashboard figure is gross of commission.
+        for symbol, group in groupby(rows, key=attrgetter('symbol')):
+            pnls = match_positions(*trade_arrays(list(group), include_commission=False))[0]
+            total_pnl += float(pnls.sum())
+            winning_trades += int((pnls > 0).sum())
+        
+        win_rate = (winning_trades / total_trades) * 100
         
         return DashboardStats(
-            total_trades=len(trades),
-            total_pnl=total_pnl,
+            total_trades=total_trades,
+            total_pnl=to_decimal(total_pnl),
             win_rate=round(win_rate, 2),
             total_commission=total_commission,
-            best_trade=max([t.price * t.quantity for t in trades], default=Decimal('0')),
-            worst_trade=min([t.price * t.quantity for t in trades], default=Decimal('0'))
+            best_trade=best_trade,
+            worst_trade=worst_trade
         )
 
     def import_from_csv(self, file: UploadFile, account_id: uuid.UUID, user_id: uuid.UUID) -> CSVImportResult:
@@ -164,77 +185,91 @@ class TradeLogService:
         if not account:
             raise HTTPException(status_code=404, detail="Trade account not found")
         
-        content = file.file.read()
-        csv_content = content.decode('utf-8')
-        
-        # Parse IBKR CSV which has different sections
-        lines = csv_content.strip().split('\n')
-        trades_section_started = False
-        trade_lines = []
-        
-        for line in lines:
-            if line.startswith('Trades,Header,'):
-                trades_section_started = True
-                trade_lines.append(line)
-            elif trades_section_started and line.startswith('Trades,Data,'):
-                trade_lines.append(line)
-            elif trades_section_started and not line.startswith('Trades,'):
-                # End of trades section
-                break
-        
-        if not trade_lines:
-            return CSVImportResult(
-                imported_count=0,
-                error_count=1,
-                errors=["No trades section found in CSV file"]
-            )
-        
-        # Process the trades section
-        trades_csv = '\n'.join(trade_lines)
-        reader = csv.DictReader(io.StringIO(trades_csv))
-        imported_trades = []
-        errors = []
-        
-        for row_num, row in enumerate(reader, start=1):
-            try:
-                # Map IBKR CSV columns to our trade model
-                trade_data = self._parse_ibkr_csv_row(row)
-                trade_data['account_id'] = account_id
-                
-                trade = Trade(**trade_data)
-                self.db.add(trade)
-                imported_trades.append(trade)
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-        
-        if imported_trades:
+        # Stream the upload line by line rather than reading it into memory;
+        # peak memory is one insert batch, not the whole statement
+        text = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+        try:
+            # Plain csv.reader plus one zip per row; DictReader's per-row
+            # bookkeeping for short/long rows is not needed here
+            reader = self._iter_ibkr_trades_section(csv.reader(text))
+            headers = next(reader, None)
+            if headers is None:
+                return CSVImportResult(
+                    imported_count=0,
+                    error_count=1,
+                    errors=["No trades section found in CSV file"]
+                )
+
+            batch = []
+            imported_count = 0
+            errors = []
+
+            for row_num, fields in enumerate(reader, start=1):
+                try:
+                    # Map IBKR CSV columns to our trade model
+                    trade_data = self._parse_ibkr_csv_row(dict(zip(headers, fields)))
+                    if trade_data is None:
+                        continue
+                    trade_data['account_id'] = account_id
+                    batch.append(trade_data)
+
+                except Exception as e:
+                    errors.append(f"Row {row_num}: {str(e)}")
+                    continue
+
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self.db.execute(_TRADE_TABLE_INSERT, batch)
+                    imported_count += len(batch)
+                    batch = []
+        finally:
+            # Hand the underlying file back to UploadFile, which closes it
+            text.detach()
+
+        if batch:
+            self.db.execute(_TRADE_TABLE_INSERT, batch)
+            imported_count += len(batch)
+
+        if imported_count:
+            self.mark_user_data_changed(user_id)
             self.db.commit()
-        
+
         return CSVImportResult(
-            imported_count=len(imported_trades),
+            imported_count=imported_count,
             error_count=len(errors),
             errors=errors
         )
 
-    def _parse_ibkr_csv_row(self, row: dict) -> dict:
-        """Parse IBKR CSV row into trade data"""
+    def _iter_ibkr_trades_section(self, rows):
+        """Yield the header and data rows of the Trades section of an IBKR statement"""
+        trades_section_started = False
+
+        for row in rows:
+            if row and row[0] == 'Trades':
+                kind = row[1] if len(row) > 1 else ''
+                if kind == 'Header':
+                    trades_section_started = True
+                    yield row
+                elif trades_section_started and kind == 'Data':
+                    yield row
+            elif trades_section_started:
+                # End of trades section; the rest of the statement is never tokenised
+                break
+
+    def _parse_ibkr_csv_row(self, row: dict) -> Optional[dict]:
+        """Parse IBKR CSV row into trade data, or None for rows that are not stock trades"""
+        # Skip non-trade rows and non-stock trades before any parsing work
+        if row.get('Header') != 'Data' or row.get('Asset Category') != 'Stocks':
+            return None
+        
         try:
-            # Skip non-trade rows - check the Header column for "Data"
-            if row.get('Header') != 'Data':
-                raise ValueError("Not a trade data row")
-            
-            # Skip non-stock trades
-            if row.get('Asset Category') != 'Stocks':
-                raise ValueError("Not a stock trade")
-            
-            quantity = Decimal(str(row.get('Quantity', '0')))
-            price = Decimal(str(row.get('T. Price', '0')))
-            commission = abs(Decimal(str(row.get('Comm/Fee', '0'))))
+            # CSV fields are already strings, so Decimal can take them directly
+            quantity = Decimal(row.get('Quantity', '0'))
+            price = Decimal(row.get('T. Price', '0'))
+            commission = abs(Decimal(row.get('Comm/Fee', '0')))
             
             # Parse date/time format: "2025-04-09;14:18:37"
             date_time_str = row.get('Date/Time', '')
-            trade_date = datetime.strptime(date_time_str, '%Y-%m-%d;%H:%M:%S')
+            trade_date = _fast_parse_ibkr_dt(date_time_str)
             
             return {
                 'symbol': row.get('Symbol', '').strip(),
@@ -252,8 +287,9 @@ class TradeLogService:
 
     def create_trade_tag(self, tag_data: TradeTagCreate, user_id: uuid.UUID) -> TradeTag:
         """Create a new trade tag"""
-        tag = TradeTag(**tag_data.dict(), user_id=user_id)
+        tag = TradeTag(**tag_data.model_dump(), user_id=user_id)
         self.db.add(tag)
+        self.mark_user_data_changed(user_id)
         self.db.commit()
         self.db.refresh(tag)
         return tag
@@ -272,7 +308,7 @@ class TradeLogService:
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
-        entry = TradeJournalEntry(**entry_data.dict())
+        entry = TradeJournalEntry(**entry_data.model_dump())
         self.db.add(entry)
         self.db.commit()
         self.db.refresh(entry)
@@ -280,54 +316,23 @@ class TradeLogService:
 
     def get_win_loss_analysis(self, user_id: uuid.UUID, time_period: str = "all") -> WinLossAnalysis:
         """Calculate comprehensive win/loss analysis"""
-        try:
-            # Get trades based on time period
-            query = self.db.query(Trade).join(TradeAccount).filter(
-                TradeAccount.user_id == user_id
-            )
-            
-            # Apply time filter
-            if time_period != "all":
-                cutoff_date = self._get_cutoff_date(time_period)
-                query = query.filter(Trade.trade_date >= cutoff_date)
-            
-            trades = query.order_by(Trade.trade_date).all()
-            
-            if not trades:
-                return WinLossAnalysis(
-                    overall=self._empty_breakdown(),
-                    by_timeframe=[],
-                    by_symbol=[],
-                    by_strategy=[],
-                    time_period=time_period
-                )
-            
-            # Calculate P&L for each closed position
-            positions_data = self._calculate_positions_pnl(trades)
-            
-            # Overall analysis
-            overall = self._calculate_breakdown(positions_data)
-            
-            # By timeframe analysis
-            by_timeframe = self._analyze_by_timeframe(positions_data)
-            
-            # By symbol analysis
-            by_symbol = self._analyze_by_symbol(positions_data)
-            
-            # By strategy analysis (based on tags)
-            by_strategy = self._analyze_by_strategy(positions_data)
-            
-            return WinLossAnalysis(
-                overall=overall,
-                by_timeframe=by_timeframe,
-                by_symbol=by_symbol,
-                by_strategy=by_strategy,
-                time_period=time_period
-            )
+        # Get trades based on time period
+        # Tags are loaded up front in one extra SELECT rather than per closing trade
+        query = self.db.query(Trade).options(
+            selectinload(Trade.tags).joinedload(TradeTagAssociation.tag)
+        ).join(Trade.account).filter(
+            TradeAccount.user_id == user_id
+        )
         
-        except Exception as e:
-            # For debugging - let's return a simple analysis
-            print(f"Win/Loss Analysis Error: {str(e)}")
+        # Apply time filter; "all" (and unknown periods) leave the query unfiltered
+        cutoff_date = self._get_cutoff_date(time_period)
+        if cutoff_date is not None:
+            query = query.filter(Trade.trade_date >= cutoff_date)
+        
+        # Symbol-major order lets P&L matching stream each symbol's trades in date order
+        trades = query.order_by(Trade.symbol, Trade.trade_date).all()
+        
+        if not trades:
             return WinLossAnalysis(
                 overall=self._empty_breakdown(),
                 by_timeframe=[],
@@ -335,120 +340,117 @@ class TradeLogService:
                 by_strategy=[],
                 time_period=time_period
             )
-    
-    def _get_cutoff_date(self, time_period: str) -> datetime:
-        """Get cutoff date based on time period"""
-        now = datetime.now()
-        
-        if time_period == "1m":
-            return now - timedelta(days=30)
-        elif time_period == "3m":
-            return now - timedelta(days=90)
-        elif time_period == "6m":
-            return now - timedelta(days=180)
-        elif time_period == "1y":
-            return now - timedelta(days=365)
-        elif time_period == "ytd":
-            return datetime(now.year, 1, 1)
-        else:
-            return datetime.min
-    
-    def _calculate_positions_pnl(self, trades: List[Trade]) -> List[Dict]:
-        """Calculate P&L for closed positions"""
-        positions = defaultdict(list)
         
-        # Group trades by symbol
-        for trade in trades:
-            positions[trade.symbol].append(trade)
+        # Calculate P&L for each closed position
+        tags_by_trade = {t.id: [ta.tag.name for ta in t.tags] for t in trades}
+        positions_data = self._calculate_positions_pnl(trades, tags_by_trade)
+        
+        # Overall, timeframe, symbol and strategy (tag) views in one pass
+        overall, by_timeframe, by_symbol, by_strategy = self._analyze_positions(positions_data)
         
-        # Calculate P&L for each position
+        return WinLossAnalysis(
+            overall=overall,
+            by_timeframe=by_timeframe,
+            by_symbol=by_symbol,
+            by_strategy=by_strategy,
+            time_period=time_period
+        )
+    
+    def _get_cutoff_date(self, time_period: str) -> Optional[datetime]:
+        """Get cutoff date based on time period, or None when no filter applies.
+        Cutoffs fall on midnight so the window only moves when the date (and the ETag) does."""
+        today = date.today()
+        if time_period == "ytd":
+            return datetime(today.year, 1, 1)
+        days = _CUTOFF_DAYS.get(time_period)
+        if days is None:
+            return None
+        return datetime.combine(today - timedelta(days=days), time.min)
+    
+    def _calculate_positions_pnl(self, trades: List[Trade], tags_by_trade: Dict[uuid.UUID, List[str]]) -> List[Dict]:
+        """Calculate P&L for closed positions; trades must be ordered by (symbol, trade_date)"""
         position_results = []
         
-        for symbol, symbol_trades in positions.items():
-            symbol_trades.sort(key=lambda x: x.trade_date)
+        for symbol, group in groupby(trades, key=attrgetter('symbol')):
+            symbol_trades = list(group)
+            pnls, close_qtys, entry_prices, close_idx, open_idx = match_positions(*trade_arrays(symbol_trades))
             
-            position_qty = Decimal('0')
-            avg_price = Decimal('0')
-            
-            for i, trade in enumerate(symbol_trades):
-                if trade.side == 'BUY':
-                    if position_qty == 0:
-                        avg_price = trade.price
-                    else:
-                        avg_price = ((avg_price * position_qty) + (trade.price * trade.quantity)) / (position_qty + trade.quantity)
-                    position_qty += trade.quantity
-                    
-                else:  # SELL
-                    if position_qty > 0:
-                        # Calculate P&L for this closing trade
-                        close_qty = min(trade.quantity, position_qty)
-                        pnl = (trade.price - avg_price) * close_qty - trade.commission
-                        
-                        # Find corresponding opening trades for strategy tags
-                        opening_trades = [t for t in symbol_trades[:i] if t.side == 'BUY']
-                        tags = []
-                        if opening_trades:
-                            # Get tags from the most recent opening trade
-                            last_open = opening_trades[-1]
-                            tag_assocs = self.db.query(TradeTagAssociation).filter(
-                                TradeTagAssociation.trade_id == last_open.id
-                            ).all()
-                            tags = []
-                            for ta in tag_assocs:
-                                tag = self.db.query(TradeTag).filter(TradeTag.id == ta.tag_id).first()
-                                if tag:
-                                    tags.append(tag.name)
-                        
-                        position_results.append({
-                            'symbol': symbol,
-                            'pnl': pnl,
-                            'close_date': trade.trade_date,
-                            'quantity': close_qty,
-                            'entry_price': avg_price,
-                            'exit_price': trade.price,
-                            'tags': tags,
-                            'hold_time': trade.trade_date - opening_trades[-1].trade_date if opening_trades else timedelta(0)
-                        })
-                        
-                        position_qty -= close_qty
-                        
-                        # If position is fully closed, reset
-                        if position_qty == 0:
-                            avg_price = Decimal('0')
+            for pnl, close_qty, entry_price, i, j in zip(
+                pnls.tolist(), close_qtys.tolist(), entry_prices.tolist(), close_idx.tolist(), open_idx.tolist()
+            ):
+                trade = symbol_trades[i]
+                last_open = symbol_trades[j]
+                position_results.append({
+                    'symbol': symbol,
+                    'pnl': pnl,
+                    'close_date': trade.trade_date,
+                    'quantity': close_qty,
+                    'entry_price': entry_price,
+                    'exit_price': float(trade.price),
+                    # Strategy tags come from the most recent opening trade
+                    'tags': tags_by_trade.get(last_open.id, []),
+                    'hold_time': trade.trade_date - last_open.trade_date
+                })
         
         return position_results
     
-    def _calculate_breakdown(self, positions: List[Dict]) -> WinLossBreakdown:
-        """Calculate win/loss breakdown from positions"""
-        if not positions:
-            return self._empty_breakdown()
-        
-        wins = [p for p in positions if p['pnl'] > 0]
-        losses = [p for p in positions if p['pnl'] < 0]
-        breakeven = [p for p in positions if p['pnl'] == 0]
-        
-        total_wins = sum(p['pnl'] for p in wins) if wins else Decimal('0')
-        total_losses = abs(sum(p['pnl'] for p in losses)) if losses else Decimal('0')
-        
-        win_rate = (len(wins) / len(positions) * 100) if positions else 0
-        avg_win = (total_wins / len(wins)) if wins else Decimal('0')
-        avg_loss = (total_losses / len(losses)) if losses else Decimal('0')
-        profit_factor = float(total_wins / total_losses) if total_losses > 0 else float('inf') if total_wins > 0 else 0.0
-        
-        # Expectancy = (Win% * Avg Win) - (Loss% * Avg Loss)
-        win_pct = len(wins) / len(positions) if positions else 0
-        loss_pct = len(losses) / len(positions) if positions else 0
-        expectancy = (win_pct * avg_win) - (loss_pct * avg_loss)
+    def _new_accumulator(self) -> Dict:
+        """Running totals for one win/loss group (floats; converted to Decimal on output)"""
+        return {
+            'wins': 0,
+            'losses': 0,
+            'breakeven': 0,
+            'total_wins': 0.0,
+            'total_losses': 0.0,
+            'hold_hours': 0.0,
+            'hold_count': 0
+        }
+    
+    def _accumulate(self, groups: Dict[str, Dict], key: str, position: Dict):
+        """Fold one closed position into the accumulator for key"""
+        agg = groups.get(key)
+        if agg is None:
+            agg = groups[key] = self._new_accumulator()
+        
+        pnl = position['pnl']
+        if pnl > 0:
+            agg['wins'] += 1
+            agg['total_wins'] += pnl
+        elif pnl < 0:
+            agg['losses'] += 1
+            agg['total_losses'] -= pnl
+        else:
+            agg['breakeven'] += 1
         
+        if position['hold_time']:
+            agg['hold_hours'] += position['hold_time'].total_seconds() / 3600
+            agg['hold_count'] += 1
+    
+    def _finalize_breakdown(self, agg: Dict) -> WinLossBreakdown:
+        """Turn accumulated totals into a breakdown"""
+        n_wins, n_losses = agg['wins'], agg['losses']
+        total_wins, total_losses = agg['total_wins'], agg['total_losses']
+        n = n_wins + n_losses + agg['breakeven']
+        
+        win_rate = n_wins / n * 100
+        avg_win = (total_wins / n_wins) if n_wins else 0.0
+        avg_loss = (total_losses / n_losses) if n_losses else 0.0
+        profit_factor = total_wins / total_losses if total_losses > 0 else float('inf') if total_wins > 0 else 0.0
+        
+        # Expectancy = (Win% * Avg Win) - (Loss% * Avg Loss), which reduces to
+        # (total wins - total losses) / n
+        expectancy = (total_wins - total_losses) / n
+        
+        # Amounts are rounded once, here, when they leave float arithmetic
         return WinLossBreakdown(
-            wins=len(wins),
-            losses=len(losses),
-            breakeven=len(breakeven),
+            wins=n_wins,
+            losses=n_losses,
+            breakeven=agg['breakeven'],
             win_rate=round(win_rate, 2),
-            avg_win=avg_win,
-            avg_loss=avg_loss,
+            avg_win=to_decimal(avg_win),
+            avg_loss=to_decimal(avg_loss),
             profit_factor=round(profit_factor, 2),
-            expectancy=expectancy
+            expectancy=to_decimal(expectancy)
         )
     
     def _empty_breakdown(self) -> WinLossBreakdown:
@@ -458,95 +460,64 @@ class TradeLogService:
             losses=0,
             breakeven=0,
             win_rate=0.0,
-            avg_win=Decimal('0'),
-            avg_loss=Decimal('0'),
+            avg_win=to_decimal(0.0),
+            avg_loss=to_decimal(0.0),
             profit_factor=0.0,
-            expectancy=Decimal('0')
+            expectancy=to_decimal(0.0)
         )
     
-    def _analyze_by_timeframe(self, positions: List[Dict]) -> List[WinLossByTimeframe]:
-        """Analyze win/loss by different timeframes"""
+    def _analyze_positions(
+        self, positions: List[Dict]
+    ) -> Tuple[WinLossBreakdown, List[WinLossByTimeframe], List[WinLossBySymbol], List[WinLossByStrategy]]:
+        """Build the overall, monthly, per-symbol and per-strategy breakdowns in one scan"""
         if not positions:
-            return []
+            return self._empty_breakdown(), [], [], []
         
-        # Group by month
-        monthly_groups = defaultdict(list)
+        overall = {}
+        monthly_groups = {}
+        symbol_groups = {}
+        strategy_groups = {}
         for pos in positions:
-            month_key = pos['close_date'].strftime('%Y-%m')
-            monthly_groups[month_key].append(pos)
-        
-        results = []
-        for period, period_positions in sorted(monthly_groups.items()):
-            breakdown = self._calculate_breakdown(period_positions)
-            total_pnl = sum(p['pnl'] for p in period_positions)
-            
-            results.append(WinLossByTimeframe(
+            self._accumulate(overall, 'all', pos)
+            self._accumulate(monthly_groups, pos['close_date'].strftime('%Y-%m'), pos)
+            self._accumulate(symbol_groups, pos['symbol'], pos)
+            for tag in pos['tags'] or ['No Strategy']:
+                self._accumulate(strategy_groups, tag, pos)
+        
+        by_timeframe = [
+            WinLossByTimeframe(
                 period=period,
                 timeframe_type="monthly",
-                breakdown=breakdown,
-                total_pnl=total_pnl,
-                trade_count=len(period_positions)
-            ))
-        
-        return results
-    
-    def _analyze_by_symbol(self, positions: List[Dict]) -> List[WinLossBySymbol]:
-        """Analyze win/loss by symbol"""
-        if not positions:
-            return []
-        
-        symbol_groups = defaultdict(list)
-        for pos in positions:
-            symbol_groups[pos['symbol']].append(pos)
+                breakdown=self._finalize_breakdown(agg),
+                total_pnl=to_decimal(agg['total_wins'] - agg['total_losses']),
+                trade_count=agg['wins'] + agg['losses'] + agg['breakeven']
+            )
+            for period, agg in sorted(monthly_groups.items())
+        ]
         
-        results = []
-        for symbol, symbol_positions in symbol_groups.items():
-            breakdown = self._calculate_breakdown(symbol_positions)
-            total_pnl = sum(p['pnl'] for p in symbol_positions)
-            
-            # Calculate average hold time
-            hold_times = [p['hold_time'].total_seconds() / 3600 for p in symbol_positions if p['hold_time']]
-            avg_hold_time = sum(hold_times) / len(hold_times) if hold_times else None
-            
-            results.append(WinLossBySymbol(
+        by_symbol = [
+            WinLossBySymbol(
                 symbol=symbol,
-                breakdown=breakdown,
-                total_pnl=total_pnl,
-                trade_count=len(symbol_positions),
-                avg_hold_time_hours=avg_hold_time
-            ))
-        
-        # Sort by total P&L descending
-        results.sort(key=lambda x: x.total_pnl, reverse=True)
-        return results
-    
-    def _analyze_by_strategy(self, positions: List[Dict]) -> List[WinLossByStrategy]:
-        """Analyze win/loss by strategy (tags)"""
-        if not positions:
-            return []
-        
-        strategy_groups = defaultdict(list)
+                breakdown=self._finalize_breakdown(agg),
+                total_pnl=to_decimal(agg['total_wins'] - agg['total_losses']),
+                trade_count=agg['wins'] + agg['losses'] + agg['breakeven'],
+                avg_hold_time_hours=agg['hold_hours'] / agg['hold_count'] if agg['hold_count'] else None
+            )
+            for symbol, agg in symbol_groups.items()
+        ]
         
-        # Group by tags (strategies)
-        for pos in positions:
-            if pos['tags']:
-                for tag in pos['tags']:
-                    strategy_groups[tag].append(pos)
-            else:
-                strategy_groups['No Strategy'].append(pos)
-        
-        results = []
-        for strategy, strategy_positions in strategy_groups.items():
-            breakdown = self._calculate_breakdown(strategy_positions)
-            total_pnl = sum(p['pnl'] for p in strategy_positions)
-            
-            results.append(WinLossByStrategy(
+        by_strategy = [
+            WinLossByStrategy(
                 strategy=strategy,
-                breakdown=breakdown,
-                total_pnl=total_pnl,
-                trade_count=len(strategy_positions)
-            ))
+                breakdown=self._finalize_breakdown(agg),
+                total_pnl=to_decimal(agg['total_wins'] - agg['total_losses']),
+                trade_count=agg['wins'] + agg['losses'] + agg['breakeven']
+            )
+            for strategy, agg in strategy_groups.items()
+        ]
         
         # Sort by total P&L descending
-        results.sort(key=lambda x: x.total_pnl, reverse=True)
-        return results
\ No newline at end of file
+        by_symbol.sort(key=lambda x: x.total_pnl, reverse=True)
+        by_strategy.sort(key=lambda x: x.total_pnl, reverse=True)
+        
+        return self._finalize_breakdown(overall['all']), by_timeframe, by_symbol, by_strategy
@@ -7,8 +7,7 @@ Creates all tables and optionally seeds with sample data
 
 import os
 import sys
-from sqlalchemy import create_engine
-from app.core.database import Base, get_db
+from app.core.database import Base, engine, SessionLocal
 from app.core.config import settings
 from app.core.models import User, TradeAccount, Trade, TradeTag, TradeJournalEntry, TradeTagAssociation
 
@@ -16,9 +15,6 @@ def init_database():
     """Initialize the database with all tables"""
     print("Initializing TradeWizard database...")
     
-    # Create engine
-    engine = create_engine(settings.DATABASE_URL)
-    
     # Create all tables
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
@@ -33,7 +29,6 @@ def init_database():
 
 def create_sample_data():
     """Create some sample data for testing"""
-    from sqlalchemy.orm import sessionmaker
     from app.core.security import get_password_hash
     from datetime import datetime, timezone
     from decimal import Decimal
@@ -41,8 +36,6 @@ def create_sample_data():
     
     print("\nCreating sample data...")
     
-    engine = create_engine(settings.DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
     
     try:
@@ -53,8 +46,8 @@ def create_sample_data():
             subscription_tier="free"
         )
         db.add(sample_user)
-        db.commit()
-        db.refresh(sample_user)
+        # Flush rather than commit: assigns the id while keeping one transaction
+        db.flush()
         
         # Create sample trade account
         sample_account = TradeAccount(
@@ -64,8 +57,7 @@ def create_sample_data():
             account_number="U12345678"
         )
         db.add(sample_account)
-        db.commit()
-        db.refresh(sample_account)
+        db.flush()
         
         # Create sample trades
         sample_trades = [
@@ -104,14 +96,6 @@ def create_sample_data():
             }
         ]
         
-        created_trades = []
-        for trade_data in sample_trades:
-            trade = Trade(**trade_data)
-            db.add(trade)
-            created_trades.append(trade)
-        
-        db.commit()
-        
         # Create sample tags
         sample_tags = [
             {"user_id": sample_user.id, "name": "Tech Stock", "color": "#3B82F6"},
@@ -119,10 +103,10 @@ def create_sample_data():
             {"user_id": sample_user.id, "name": "Day Trade", "color": "#F59E0B"}
         ]
         
-        for tag_data in sample_tags:
-            tag = TradeTag(**tag_data)
-            db.add(tag)
-        
+        db.add_all(
+            [Trade(**trade_data) for trade_data in sample_trades]
+            + [TradeTag(**tag_data) for tag_data in sample_tags]
+        )
         db.commit()
         
         print("Sample data created successfully!")
@@ -0,0 +1,105 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.modules.tradelog.pnl import match_positions, to_decimal
+
+
+def _run(trades):
+    """trades: list of (side, price, quantity, commission)"""
+    prices = np.array([float(t[1]) for t in trades], dtype=np.float64)
+    quantities = np.array([float(t[2]) for t in trades], dtype=np.float64)
+    is_buy = np.array([t[0] == 'BUY' for t in trades], dtype=np.bool_)
+    commissions = np.array([float(t[3]) for t in trades], dtype=np.float64)
+    return match_positions(prices, quantities, is_buy, commissions)
+
+
+def _reference(trades):
+    """Running-average matcher in Decimal, as the service computed it before the kernel"""
+    results = []
+    position = Decimal('0')
+    avg_price = Decimal('0')
+    for i, (side, price, quantity, commission) in enumerate(trades):
+        if side == 'BUY':
+            if position == 0:
+                avg_price = price
+            else:
+                avg_price = (avg_price * position + price * quantity) / (position + quantity)
+            position += quantity
+        elif position > 0:
+            close_qty = min(quantity, position)
+            results.append((i, (price - avg_price) * close_qty - commission, close_qty))
+            position -= close_qty
+            if position == 0:
+                avg_price = Decimal('0')
+    return results
+
+
+def test_fractional_exact_close_leaves_no_phantom_position():
+    trades = [
+        ('BUY', Decimal('10'), Decimal('0.1'), Decimal('0')),
+        ('BUY', Decimal('10'), Decimal('0.2'), Decimal('0')),
+        ('SELL', Decimal('11'), Decimal('0.3'), Decimal('1')),
+        ('SELL', Decimal('12'), Decimal('1.0'), Decimal('1')),
+    ]
+    pnls, close_qtys, entry_prices, close_idx, open_idx = _run(trades)
+
+    assert close_idx.tolist() == [2]
+    assert to_decimal(close_qtys[0]) == Decimal('0.3')
+    assert to_decimal(pnls[0]) == Decimal('-0.7')
+    assert open_idx.tolist() == [1]
+
+
+def test_oversell_is_clamped_and_next_buy_resets_average():
+    trades = [
+        ('BUY', Decimal('10'), Decimal('5'), Decimal('0')),
+        ('SELL', Decimal('12'), Decimal('8'), Decimal('0')),
+        ('BUY', Decimal('20'), Decimal('3'), Decimal('0')),
+        ('SELL', Decimal('21'), Decimal('3'), Decimal('0')),
+    ]
+    pnls, close_qtys, entry_prices, close_idx, open_idx = _run(trades)
+
+    assert close_idx.tolist() == [1, 3]
+    assert close_qtys.tolist() == [5.0, 3.0]
+    # The position went flat, so the second buy starts a fresh average
+    assert entry_prices.tolist() == [10.0, 20.0]
+    assert pnls.tolist() == [10.0, 3.0]
+
+
+def test_sell_without_open_position_is_ignored():
+    pnls, *_ = _run([('SELL', Decimal('10'), Decimal('1'), Decimal('1'))])
+    assert pnls.size == 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    (-8497.999999999998, Decimal('-8498.0')),
+    (74.68999999999897, Decimal('74.69')),
+    (-0.0, Decimal('0.0')),
+    (-1e-12, Decimal('0.0')),
+])
+def test_to_decimal_rounds_float_noise(value, expected):
+    result = to_decimal(value)
+    assert result == expected
+    assert str(result) == str(expected)
+
+
+def test_matches_decimal_reference():
+    rng = random.Random(20250609)
+    for _ in range(500):
+        trades = []
+        for _ in range(rng.randint(1, 12)):
+            side = rng.choice(['BUY', 'SELL'])
+            price = Decimal(rng.randint(100, 50000)) / 100
+            quantity = Decimal(rng.randint(1, 5000)) / rng.choice([1, 10, 100, 1000])
+            commission = Decimal(rng.randint(0, 500)) / 100
+            trades.append((side, price, quantity, commission))
+
+        expected = _reference(trades)
+        pnls, close_qtys, _, close_idx, _ = _run(trades)
+
+        assert close_idx.tolist() == [i for i, _, _ in expected], trades
+        for pnl, close_qty, (_, ref_pnl, ref_qty) in zip(pnls.tolist(), close_qtys.tolist(), expected):
+            assert abs(to_decimal(pnl) - ref_pnl) < Decimal('1e-6'), trades
+            assert abs(to_decimal(close_qty) - ref_qty) < Decimal('1e-8'), trades